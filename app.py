@@ -1,12 +1,20 @@
 import streamlit as st
-import pandas as pd
+import polars as pl
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import redis
 from typing import List, Dict, Any
 import numpy as np
+import hashlib
+import json
+import time
 import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, quote
 
 st.set_page_config(
     page_title="Spotify Music Analytics",
@@ -16,9 +24,85 @@ st.set_page_config(
 )
 
 API_BASE = os.getenv('API_BASE', "http://localhost:8000")
+REDIS_URL = os.getenv('REDIS_URL', "redis://localhost:6379/0")
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', "data/cache")
 
+# Constant choices, allocated once at import instead of per rerun
+POPULAR_GENRES = ("rock", "pop", "electronic", "jazz", "hip-hop", "country")
+AVAILABLE_GENRES = ("rock", "pop", "jazz", "electronic", "hip-hop", "country",
+                    "classical", "metal", "indie", "folk", "r-n-b", "dance")
+RANKING_GENRES = ("rock", "pop", "jazz", "electronic", "hip-hop", "country",
+                  "classical", "metal")
+RADAR_THETA = ("Danceability", "Energy", "Valence", "Tempo")
+ENDPOINT_MAP = {
+    "Songs": "/search/song/{q}",
+    "Artists": "/tracks/{q}",
+    "Albums": "/albums/{q}"
+}
 
-st.markdown("""
+# Freshness policy per endpoint prefix (seconds); first match wins
+CACHE_TTLS = (
+    ("/health", 5),
+    ("/analytics/", 60),
+    ("/search/", 20),
+)
+DEFAULT_CACHE_TTL = 20
+STALE_GRACE = 300  # keep stale bodies around as a fallback when the API is down
+
+# Streamlit re-executes this script on every widget interaction, so
+# long-lived resources go through st.cache_resource factories: built
+# once per server process, reused across reruns and sessions.
+
+@st.cache_resource
+def _get_session() -> requests.Session:
+    """Shared session so the dashboard's fan-out of API calls reuses
+    pooled keep-alive connections instead of paying a TCP handshake
+    per request (or per rerun)"""
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=64,
+        max_retries=Retry(total=2, backoff_factor=0.2)
+    ))
+    return session
+
+
+@st.cache_resource
+def _get_redis():
+    """Shared Redis client, or None when no server is reachable; the
+    ping round-trip runs once, not on every rerun"""
+    try:
+        client = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+        client.ping()
+        return client
+    except redis.RedisError:
+        return None
+
+
+@st.cache_resource
+def _get_executor() -> ThreadPoolExecutor:
+    """Shared worker pool for call_api_many's concurrent fetches"""
+    return ThreadPoolExecutor(max_workers=8)
+
+
+def _cache_ttl(endpoint: str) -> int:
+    for prefix, ttl in CACHE_TTLS:
+        if endpoint.startswith(prefix):
+            return ttl
+    return DEFAULT_CACHE_TTL
+
+
+def _cache_key(endpoint: str, params: dict = None) -> str:
+    # Canonicalise so e.g. genres=["rock","pop"] and ["pop","rock"] share a key
+    key_params = sorted(
+        (k, tuple(sorted(v)) if isinstance(v, list) else v)
+        for k, v in (params or {}).items()
+    )
+    digest = hashlib.sha1(f"{endpoint}?{urlencode(key_params)}".encode()).hexdigest()
+    return f"api_cache:{digest}"
+
+
+CSS = """
 <style>
     .metric-card {
         background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
@@ -31,21 +115,158 @@ st.markdown("""
         background-color: #f0f2f6;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
 
 @st.cache_data
-def call_api(endpoint: str, params: dict = None) -> dict:
-    """Make API calls with caching"""
+def _fetch_api(endpoint: str, params: dict = None) -> dict:
+    """Fetch one endpoint with caching (in-process + shared Redis).
+
+    Safe to run on call_api_many's worker threads: it never touches
+    st UI elements (those need the script thread's ScriptRunContext).
+    A failed request comes back as {'_error': ...} for the caller to
+    report.
+    """
+    key = _cache_key(endpoint, params)
+    redis_client = _get_redis()
+    cached = {}
+    if redis_client is not None:
+        try:
+            cached = redis_client.hgetall(key)
+        except redis.RedisError:
+            cached = {}
+
+    now = time.time()
+    if cached and now < float(cached.get('stale_at', 0)):
+        return json.loads(cached['body'])
+
     try:
         url = f"{API_BASE}{endpoint}"
-        response = requests.get(url, params=params)
+        headers = {'Accept-Encoding': 'gzip'}
+        if cached.get('etag'):
+            # Conditional GET: a 304 skips the body transfer entirely
+            headers['If-None-Match'] = cached['etag']
+        response = _get_session().get(url, params=params, timeout=(2, 10), headers=headers)
+
+        ttl = _cache_ttl(endpoint)
+        if response.status_code == 304 and cached.get('body'):
+            if redis_client is not None:
+                try:
+                    redis_client.hset(key, 'stale_at', now + ttl)
+                    redis_client.expire(key, ttl + STALE_GRACE)
+                except redis.RedisError:
+                    pass
+            return json.loads(cached['body'])
+
         response.raise_for_status()
+
+        if redis_client is not None:
+            try:
+                redis_client.hset(key, mapping={
+                    'body': response.text,
+                    'etag': response.headers.get('ETag', ''),
+                    'generated_at': now,
+                    'stale_at': now + ttl
+                })
+                redis_client.expire(key, ttl + STALE_GRACE)
+            except redis.RedisError:
+                pass
+
         return response.json()
     except requests.exceptions.RequestException as e:
-        st.error(f"API Error: {str(e)}")
-        return {}
+        # Serve the last known body (even stale) rather than an empty page
+        if cached.get('body'):
+            return json.loads(cached['body'])
+        return {'_error': str(e)}
+
+
+def _report_error(result: dict):
+    if '_error' in result:
+        st.error(f"API Error: {result['_error']}")
+
+
+def call_api(endpoint: str, params: dict = None) -> dict:
+    """Make an API call; failures are shown via st.error here, in the
+    script thread"""
+    result = _fetch_api(endpoint, params)
+    _report_error(result)
+    return result
+
+
+def call_api_many(specs: List[tuple]) -> List[dict]:
+    """Fetch several (endpoint, params) specs concurrently, results in order.
+
+    Errors are reported once the futures are gathered, back on the
+    script thread.
+    """
+    executor = _get_executor()
+    futures = [executor.submit(_fetch_api, endpoint, params) for endpoint, params in specs]
+    results = [future.result() for future in futures]
+    for result in results:
+        _report_error(result)
+    return results
+
+
+def _shrink(df: pl.DataFrame) -> pl.DataFrame:
+    """Downcast columns so Plotly/Arrow payloads stay small:
+    float64 -> float32, label columns -> categorical"""
+    casts = [pl.col(pl.Float64).cast(pl.Float32)]
+    for column in ('genre', 'artist', 'track_genre'):
+        if column in df.columns:
+            casts.append(pl.col(column).cast(pl.Categorical))
+    return df.with_columns(casts)
+
+
+@st.cache_data(ttl=3600)
+def load_snapshot(name: str) -> pl.DataFrame:
+    """Load a pre-aggregated Parquet snapshot written by build_snapshots.py;
+    returns an empty frame when no snapshot is available"""
+    path = os.path.join(SNAPSHOT_DIR, f"{name}.parquet")
+    if not os.path.exists(path):
+        return pl.DataFrame()
+    return pl.scan_parquet(path).collect()
+
+
+@st.cache_data(ttl=300)
+def get_genre_frame(genres: tuple) -> pl.DataFrame:
+    """Cache the already-built compare frame so widget reruns skip both
+    the network call and the frame construction"""
+    data = call_api("/analytics/compare", {"genres": list(genres)})
+    return _shrink(pl.DataFrame(data.get('genres', [])))
+
+
+@st.cache_resource
+def _build_genre_radar(names: tuple, rmat: tuple) -> go.Figure:
+    """Build (and cache) the genre radar figure.
+
+    names is a tuple of genres, rmat one already-normalised
+    (danceability, energy, valence, tempo) tuple per genre, so reruns
+    with identical numbers reuse the same Figure object.
+    """
+    fig_radar = go.Figure()
+
+    for name, r in zip(names, rmat):
+        fig_radar.add_trace(go.Scatterpolar(
+            r=list(r),
+            theta=list(RADAR_THETA),
+            fill='toself',
+            name=name.title(),
+            opacity=0.6
+        ))
+
+    fig_radar.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 1]
+            )),
+        showlegend=True,
+        title="Audio Features by Genre"
+    )
+    return fig_radar
 
 def main():
+    # st.html skips the markdown parse the old unsafe_allow_html block paid
+    st.html(CSS)
 
     st.title("🎵 Spotify Music Analytics Dashboard")
     st.markdown("---")
@@ -72,10 +293,20 @@ def show_overview():
     st.header("📈 Music Collection Overview")
     
     col1, col2, col3 = st.columns(3)
-    
-    try:
+
+    # Prefer the pre-aggregated Parquet snapshot: zero network, columnar filter
+    snapshot = load_snapshot("genre_compare")
+    if not snapshot.is_empty():
         health_data = call_api("/health")
-        
+        genre_data = {'genres': snapshot.filter(pl.col('genre').is_in(list(POPULAR_GENRES))).to_dicts()}
+    else:
+        # Fire both round-trips at once instead of serially
+        health_data, genre_data = call_api_many([
+            ("/health", None),
+            ("/analytics/compare", {"genres": sorted(POPULAR_GENRES)})
+        ])
+
+    try:
         with col1:
             st.metric("🔗 API Status", "Connected", "✅")
         
@@ -93,15 +324,10 @@ def show_overview():
         return
     
     st.subheader("🎭 Genre Distribution")
-    
-    popular_genres = ["rock", "pop", "electronic", "jazz", "hip-hop", "country"]
-    
+
     try:
-        params = "&".join([f"genres={genre}" for genre in popular_genres])
-        genre_data = call_api(f"/analytics/compare?{params}")
-        
         if genre_data.get('genres'):
-            df_genres = pd.DataFrame(genre_data['genres'])
+            df_genres = _shrink(pl.DataFrame(genre_data['genres']))
             
             fig_bar = px.bar(
                 df_genres, 
@@ -114,30 +340,13 @@ def show_overview():
             fig_bar.update_layout(height=400)
             st.plotly_chart(fig_bar, use_container_width=True)
             
-            audio_features = ['avg_danceability', 'avg_energy', 'avg_valence', 'avg_tempo']
-            
-            fig_radar = go.Figure()
-            
-            for _, genre_row in df_genres.iterrows():
-                tempo_normalized = genre_row['avg_tempo'] / 243.37 
-                fig_radar.add_trace(go.Scatterpolar(
-                    r=[genre_row['avg_danceability'], genre_row['avg_energy'], genre_row['avg_valence'], tempo_normalized],
-                    theta=['Danceability', 'Energy', 'Valence', 'Tempo'],
-                    fill='toself',
-                    name=genre_row['genre'].title(),
-                    opacity=0.6
-                ))
-            
-            fig_radar.update_layout(
-                polar=dict(
-                    radialaxis=dict(
-                        visible=True,
-                        range=[0, 1]
-                    )),
-                showlegend=True,
-                title="Audio Features by Genre"
-            )
-            
+            # Columnar extraction: one numpy matrix instead of per-row lookups
+            arr = df_genres.select(['avg_danceability', 'avg_energy', 'avg_valence']).to_numpy()
+            tempo = (df_genres['avg_tempo'].to_numpy() / 243.37).reshape(-1, 1)
+            rmat = np.round(np.concatenate([arr, tempo], axis=1), 4)
+            names = df_genres['genre'].to_list()
+            fig_radar = _build_genre_radar(tuple(names), tuple(map(tuple, rmat.tolist())))
+
             st.plotly_chart(fig_radar, use_container_width=True)
     
     except Exception as e:
@@ -155,19 +364,13 @@ def show_search_filter():
         search_type = st.selectbox("Search Type:", ["Songs", "Artists", "Albums"])
     
     if search_query and st.button("🔍 Search", type="primary"):
-        
-        endpoint_map = {
-            "Songs": f"/search/song/{search_query}",
-            "Artists": f"/tracks/{search_query}",
-            "Albums": f"/albums/{search_query}"
-        }
-        
         try:
-            results = call_api(endpoint_map[search_type])
+            # .format + quote also URL-encodes the user input properly
+            results = call_api(ENDPOINT_MAP[search_type].format(q=quote(search_query)))
             
             if search_type == "Albums" and results.get('albums'):
                 st.subheader(f"📀 Albums by {results.get('artist', search_query)}")
-                albums_df = pd.DataFrame(results['albums'])
+                albums_df = _shrink(pl.DataFrame(results['albums']))
                 
                 fig = px.bar(
                     albums_df, 
@@ -182,26 +385,30 @@ def show_search_filter():
             
             elif search_type == "Artists" and results.get('tracks'):
                 st.subheader(f"🎤 Tracks by {results.get('artist', search_query)}")
-                tracks_df = pd.DataFrame(results['tracks'])
-                
-                if not tracks_df.empty:
-                    fig_hist = px.histogram(
-                        tracks_df, 
-                        x='popularity',
+                tracks_df = _shrink(pl.DataFrame(results['tracks']))
+
+                if not tracks_df.is_empty():
+                    # Pre-bin server-side so the browser gets 20 bars, not every raw value
+                    counts, edges = np.histogram(tracks_df['popularity'].to_numpy(), bins=20)
+                    centers = 0.5 * (edges[:-1] + edges[1:])
+                    fig_hist = go.Figure(go.Bar(x=centers, y=counts))
+                    fig_hist.update_layout(
                         title="Track Popularity Distribution",
-                        nbins=20
+                        xaxis_title="popularity",
+                        yaxis_title="count"
                     )
                     st.plotly_chart(fig_hist, use_container_width=True)
                     
                     st.dataframe(
-                        tracks_df[['track_name', 'album_name', 'popularity', 'track_genre']],
+                        tracks_df.select(['track_name', 'album_name', 'popularity', 'track_genre']),
                         use_container_width=True
                     )
             
             elif search_type == "Songs" and results.get('results'):
                 st.subheader(f"🎵 Songs matching '{search_query}'")
-                songs_df = pd.DataFrame(results['results'])
-                st.dataframe(songs_df, use_container_width=True)
+                songs_df = _shrink(pl.DataFrame(results['results']))
+                # Only ship the visible slice of the Arrow table to the front-end
+                st.dataframe(songs_df.head(50), use_container_width=True)
         
         except Exception as e:
             st.error(f"Search error: {str(e)}")
@@ -234,8 +441,8 @@ def show_search_filter():
                 
                 if filtered_results.get('results'):
                     st.subheader("🎯 Filtered Results")
-                    filtered_df = pd.DataFrame(filtered_results['results'])
-                    st.dataframe(filtered_df, use_container_width=True)
+                    filtered_df = _shrink(pl.DataFrame(filtered_results['results']))
+                    st.dataframe(filtered_df.head(filter_size), use_container_width=True)
                 else:
                     st.info("No results found with those filters.")
             
@@ -244,17 +451,86 @@ def show_search_filter():
         else:
             st.warning("Please enter at least one filter criteria.")
 
+# Each chart lives in its own fragment so a widget change only reruns the
+# fragment that owns it, not every chart on the page
+@st.fragment
+def _genre_count_bars(df: pl.DataFrame):
+    col1, col2 = st.columns(2)
+
+    with col1:
+        fig_tracks = px.bar(
+            df,
+            x='genre',
+            y='track_count',
+            title="📀 Track Count by Genre",
+            color='track_count',
+            color_continuous_scale='blues'
+        )
+        st.plotly_chart(fig_tracks, use_container_width=True)
+
+    with col2:
+        fig_pop = px.bar(
+            df,
+            x='genre',
+            y='avg_popularity',
+            title="⭐ Average Popularity by Genre",
+            color='avg_popularity',
+            color_continuous_scale='reds'
+        )
+        st.plotly_chart(fig_pop, use_container_width=True)
+
+
+@st.fragment
+def _genre_heatmap(df: pl.DataFrame):
+    heatmap_cols = ['avg_danceability', 'avg_energy', 'avg_valence', 'avg_tempo_norm']
+
+    # No copy needed: with_columns derives the normalised tempo lazily
+    df_norm = df.with_columns((pl.col('avg_tempo') / 243.37).alias('avg_tempo_norm'))
+
+    fig_heatmap = px.imshow(
+        df_norm.select(heatmap_cols).to_numpy().T,
+        x=df_norm['genre'].to_list(),
+        y=heatmap_cols,
+        title="🎵 Audio Features Heatmap",
+        labels=dict(x="Genre", y="Audio Features", color="Value"),
+        aspect="auto",
+        color_continuous_scale='viridis'
+    )
+    st.plotly_chart(fig_heatmap, use_container_width=True)
+
+
+@st.fragment
+def _genre_scatter(df: pl.DataFrame):
+    # Scatter plot: Energy vs Danceability
+    fig_scatter = px.scatter(
+        df,
+        x='avg_energy',
+        y='avg_danceability',
+        size='track_count',
+        color='avg_popularity',
+        hover_name='genre',
+        title="⚡ Energy vs Danceability",
+        labels={'avg_energy': 'Energy', 'avg_danceability': 'Danceability'},
+        render_mode="webgl"
+    )
+    st.plotly_chart(fig_scatter, use_container_width=True)
+
+
+@st.fragment
+def _genre_table(df: pl.DataFrame):
+    # Summary stats table
+    st.subheader("📋 Detailed Comparison")
+    # _shrink downcasts floats to Float32, so match both widths here
+    display_df = df.with_columns(pl.col(pl.Float32, pl.Float64).round(3))
+    st.dataframe(display_df, use_container_width=True)
+
+
 def show_genre_analytics():
     st.header("📊 Genre Analytics & Comparison")
     
-    available_genres = [
-        "rock", "pop", "jazz", "electronic", "hip-hop", "country", 
-        "classical", "metal", "indie", "folk", "r-n-b", "dance"
-    ]
-    
     selected_genres = st.multiselect(
         "Select genres to compare:",
-        available_genres,
+        AVAILABLE_GENRES,
         default=["rock", "pop", "jazz"]
     )
     
@@ -264,68 +540,13 @@ def show_genre_analytics():
     
     if st.button("📈 Analyze Genres", type="primary"):
         try:
-            params = "&".join([f"genres={genre}" for genre in selected_genres])
-            comparison_data = call_api(f"/analytics/compare?{params}")
-            
-            if comparison_data.get('genres'):
-                df = pd.DataFrame(comparison_data['genres'])
-            
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    fig_tracks = px.bar(
-                        df, 
-                        x='genre', 
-                        y='track_count',
-                        title="📀 Track Count by Genre",
-                        color='track_count',
-                        color_continuous_scale='blues'
-                    )
-                    st.plotly_chart(fig_tracks, use_container_width=True)
-                
-                with col2:
-                    fig_pop = px.bar(
-                        df, 
-                        x='genre', 
-                        y='avg_popularity',
-                        title="⭐ Average Popularity by Genre",
-                        color='avg_popularity',
-                        color_continuous_scale='reds'
-                    )
-                    st.plotly_chart(fig_pop, use_container_width=True)
-                
-                audio_cols = ['avg_danceability', 'avg_energy', 'avg_valence', 'avg_tempo']
-                
-                df_norm = df.copy()
-                df_norm['avg_tempo_norm'] = df_norm['avg_tempo'] / 243.37  
-                heatmap_data = df_norm[['genre'] + ['avg_danceability', 'avg_energy', 'avg_valence', 'avg_tempo_norm']].set_index('genre')
-                
-                fig_heatmap = px.imshow(
-                    heatmap_data.T,
-                    title="🎵 Audio Features Heatmap",
-                    labels=dict(x="Genre", y="Audio Features", color="Value"),
-                    aspect="auto",
-                    color_continuous_scale='viridis'
-                )
-                st.plotly_chart(fig_heatmap, use_container_width=True)
-                
-                # Scatter plot: Energy vs Danceability
-                fig_scatter = px.scatter(
-                    df, 
-                    x='avg_energy', 
-                    y='avg_danceability',
-                    size='track_count',
-                    color='avg_popularity',
-                    hover_name='genre',
-                    title="⚡ Energy vs Danceability",
-                    labels={'avg_energy': 'Energy', 'avg_danceability': 'Danceability'}
-                )
-                st.plotly_chart(fig_scatter, use_container_width=True)
-                
-                # Summary stats table
-                st.subheader("📋 Detailed Comparison")
-                display_df = df.round(3)
-                st.dataframe(display_df, use_container_width=True)
+            df = get_genre_frame(tuple(sorted(selected_genres)))
+
+            if not df.is_empty():
+                _genre_count_bars(df)
+                _genre_heatmap(df)
+                _genre_scatter(df)
+                _genre_table(df)
         
         except Exception as e:
             st.error(f"Error analyzing genres: {str(e)}")
@@ -338,7 +559,7 @@ def show_artist_rankings():
     with col1:
         genre = st.selectbox(
             "Select Genre:",
-            ["rock", "pop", "jazz", "electronic", "hip-hop", "country", "classical", "metal"]
+            RANKING_GENRES
         )
     
     with col2:
@@ -353,16 +574,27 @@ def show_artist_rankings():
     
     if st.button("🏆 Get Top Artists", type="primary"):
         try:
-            params = {
-                "size": top_n,
-                "ranking_method": ranking_method,
-                "min_tracks": 2
-            }
-            
-            artist_data = call_api(f"/analytics/top-artists/{genre}", params)
+            # Prefer the pre-aggregated snapshot (same pattern as the
+            # overview): re-rank and slice the columnar table locally
+            # instead of re-running the aggregation per click
+            snapshot = load_snapshot(f"top_artists_{genre}")
+            if not snapshot.is_empty():
+                sort_col = 'avg_popularity' if ranking_method == "popularity" else 'track_count'
+                ranked = (snapshot
+                          .sort(sort_col, descending=True)
+                          .head(top_n)
+                          .with_columns(pl.int_range(1, pl.len() + 1).alias('rank')))
+                artist_data = {'top_artists': ranked.to_dicts()}
+            else:
+                params = {
+                    "size": top_n,
+                    "ranking_method": ranking_method,
+                    "min_tracks": 2
+                }
+                artist_data = call_api(f"/analytics/top-artists/{genre}", params)
             
             if artist_data.get('top_artists'):
-                artists_df = pd.DataFrame(artist_data['top_artists'])
+                artists_df = _shrink(pl.DataFrame(artist_data['top_artists']))
                 
                 st.subheader(f"🎤 Top {genre.title()} Artists")
                 
@@ -398,13 +630,14 @@ def show_artist_rankings():
                     hover_name='artist',
                     size='rank',
                     title="📈 Track Count vs Average Popularity",
-                    labels={'track_count': 'Number of Tracks', 'avg_popularity': 'Average Popularity'}
+                    labels={'track_count': 'Number of Tracks', 'avg_popularity': 'Average Popularity'},
+                    render_mode="webgl"
                 )
                 st.plotly_chart(fig_scatter, use_container_width=True)
                 
                 # Artists table
                 st.dataframe(
-                    artists_df[['rank', 'artist', 'track_count', 'avg_popularity']],
+                    artists_df.select(['rank', 'artist', 'track_count', 'avg_popularity']),
                     use_container_width=True,
                     hide_index=True
                 )
@@ -430,7 +663,7 @@ def show_similarity_analysis():
             similar_data = call_api(f"/similar/{track_id}", params)
             
             if similar_data.get('results'):
-                similar_df = pd.DataFrame(similar_data['results'])
+                similar_df = _shrink(pl.DataFrame(similar_data['results']))
                 
                 st.subheader("🎵 Similar Tracks Found")
                 
@@ -458,16 +691,21 @@ def show_similarity_analysis():
                     fig_features = make_subplots(
                         rows=2, cols=2,
                         subplot_titles=available_features,
-                        specs=[[{"type": "histogram"}, {"type": "histogram"}],
-                               [{"type": "histogram"}, {"type": "histogram"}]]
+                        specs=[[{"type": "xy"}, {"type": "xy"}],
+                               [{"type": "xy"}, {"type": "xy"}]]
                     )
-                    
+
                     for i, feature in enumerate(available_features):
                         row = (i // 2) + 1
                         col = (i % 2) + 1
-                        
+
+                        counts, edges = np.histogram(
+                            similar_df[feature].to_numpy().astype(np.float32),
+                            bins=20, range=(0, 1)
+                        )
+                        centers = 0.5 * (edges[:-1] + edges[1:])
                         fig_features.add_trace(
-                            go.Histogram(x=similar_df[feature], name=feature.title()),
+                            go.Bar(x=centers, y=counts, name=feature.title()),
                             row=row, col=col
                         )
                     
@@ -480,7 +718,8 @@ def show_similarity_analysis():
                     display_cols.append('similarity')
                 
                 available_cols = [col for col in display_cols if col in similar_df.columns]
-                st.dataframe(similar_df[available_cols], use_container_width=True)
+                st.dataframe(similar_df.select(available_cols).head(similarity_count),
+                             use_container_width=True)
             
             else:
                 st.info("No similar tracks found.")
@@ -1,11 +1,23 @@
-from fastapi import FastAPI, Query, HTTPException
+from fastapi import FastAPI, Query, HTTPException, Request, Response
 from typing import List, Optional
 from backend.service.indexer import Indexer
 from backend.service.downloader import Downloader
 from backend.service.searcher import SpotifySearcher
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from cachetools import TTLCache
+import hashlib
+import logging
+import os
 
+# Service modules log through logging.getLogger(__name__); run at
+# WARNING in production (LOG_LEVEL) to skip the per-hit debug output
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
 
 app = FastAPI(
     title="Spotify Elasticsearch API",
@@ -22,9 +34,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def etag_middleware(request: Request, call_next):
+    """Weak ETags for GET responses so repeat identical queries can be
+    answered with a bodyless 304 instead of the full JSON payload"""
+    response = await call_next(request)
+    if request.method != "GET" or response.status_code != 200:
+        return response
+
+    body = b""
+    async for chunk in response.body_iterator:
+        body += chunk
+
+    etag = f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"etag": etag})
+
+    headers = dict(response.headers)
+    headers.pop("content-length", None)
+    headers["etag"] = etag
+    return Response(
+        content=body,
+        status_code=response.status_code,
+        headers=headers,
+        media_type=response.media_type
+    )
+
+# Added after the ETag middleware so compression wraps it and the ETag is
+# computed over the uncompressed body
+app.add_middleware(GZipMiddleware, minimum_size=512)
+
 indexer = Indexer()
 searcher = SpotifySearcher()
 
+# Per-process response caches so repeat aggregations skip Elasticsearch;
+# rankings change slowly, so top-artists gets the longer TTL
+_compare_cache = TTLCache(maxsize=512, ttl=30)
+_top_artists_cache = TTLCache(maxsize=512, ttl=60)
+
 # @app.on_event("startup")
 # async def startup_event():
 #     """Initialize index on startup"""
@@ -67,7 +114,7 @@ searcher = SpotifySearcher()
 @app.get("/albums/{artist_name}", summary="Get artist albums")
 async def get_albums(artist_name: str, size: int = Query(50, ge=1, le=100)):
     try:
-        result = searcher.search_artist_albums(artist_name, size)
+        result = await run_in_threadpool(searcher.search_artist_albums, artist_name, size)
         return result  
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -76,7 +123,7 @@ async def get_albums(artist_name: str, size: int = Query(50, ge=1, le=100)):
 @app.get("/tracks/{artist}", summary="Get artist tracks") 
 async def get_tracks(artist: str, size: int = Query(20, ge=1, le=100)):
     try:
-        result = searcher.search_tracks_by_artist(artist, size)
+        result = await run_in_threadpool(searcher.search_tracks_by_artist, artist, size)
         return result  
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -85,7 +132,7 @@ async def get_tracks(artist: str, size: int = Query(20, ge=1, le=100)):
 @app.get("/search/song/{song}", summary="Smart song search")
 async def search_song(song: str):
     try:
-        result = searcher.song_searcher(song)
+        result = await searcher.song_searcher_async(song)
         return result  
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -97,7 +144,7 @@ async def search_song_fuzzy(
     size: int = Query(10, ge=1, le=50)
 ):
     try:
-        result = searcher.search_song_fuzzy(song, fuzziness, size)
+        result = await run_in_threadpool(searcher.search_song_fuzzy, song, fuzziness, size)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -105,7 +152,7 @@ async def search_song_fuzzy(
 @app.get("/search/phrase/{song}", summary="Exact phrase search")
 async def search_song_phrase(song: str, size: int = Query(10, ge=1, le=50)):
     try:
-        result = searcher.search_song_phrase(song, size)
+        result = await run_in_threadpool(searcher.search_song_phrase, song, size)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -119,7 +166,7 @@ async def filter_tracks(
 ):
     """Filter tracks by genre and/or album"""
     try:
-        result = searcher.filter(genre, album, size)
+        result = await run_in_threadpool(searcher.filter, genre, album, size)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -132,7 +179,7 @@ async def find_similar(
 ):
     """Find tracks similar to the given track using audio features"""
     try:
-        result = searcher.find_similar_by_vector(track_id, size)
+        result = await run_in_threadpool(searcher.find_similar_by_vector, track_id, size)
         if result is None:
             raise HTTPException(status_code=404, detail="Track not found or similarity search failed")
         return result
@@ -149,7 +196,12 @@ async def compare_genres(genres: List[str] = Query(..., description="List of gen
         if len(genres) > 10:
             raise HTTPException(status_code=400, detail="Maximum 10 genres allowed")
         
-        result = searcher.compare_genres(genres)
+        key = ("compare", tuple(sorted(genres)))
+        if key in _compare_cache:
+            return _compare_cache[key]
+
+        result = await searcher.compare_genres_async(genres)
+        _compare_cache[key] = result
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -160,7 +212,12 @@ async def get_top_artists(
     size: int = Query(10, ge=1, le=50, description="Number of top artists"),
     min_tracks: int = Query(2, ge=1, le=10, description="Minimum tracks required")):
     try:
-        result = searcher.top_artists_per_genre(genre, size)
+        key = ("top-artists", genre, size)
+        if key in _top_artists_cache:
+            return _top_artists_cache[key]
+
+        result = await run_in_threadpool(searcher.top_artists_per_genre, genre, size)
+        _top_artists_cache[key] = result
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -170,7 +227,7 @@ async def get_top_artists(
 async def health_check():
     """Check if the API and Elasticsearch are working"""
     try:
-        info = searcher.client.info()
+        info = await run_in_threadpool(searcher.client.info)
         return {
             "status": "healthy",
             "elasticsearch": {
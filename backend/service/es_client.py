@@ -0,0 +1,53 @@
+from elasticsearch import Elasticsearch, AsyncElasticsearch
+
+# orjson encodes the dict-heavy bulk and query payloads several times
+# faster than stdlib json; fall back silently when it isn't installed
+try:
+    from elasticsearch import OrjsonSerializer
+    _SERIALIZER = OrjsonSerializer()
+except ImportError:
+    _SERIALIZER = None
+
+_ES_CLIENT = None
+_ASYNC_ES_CLIENT = None
+
+
+def _client_kwargs():
+    kwargs = dict(
+        http_compress=True,
+        connections_per_node=25,
+        retry_on_timeout=True,
+        max_retries=5,
+        request_timeout=30
+    )
+    if _SERIALIZER is not None:
+        kwargs['serializer'] = _SERIALIZER
+    return kwargs
+
+
+def get_client(es_host: str) -> Elasticsearch:
+    """Shared Elasticsearch client with keep-alive connection pooling.
+
+    Both Indexer and SpotifySearcher go through here, so the process
+    opens one pool of persistent connections instead of paying a TCP
+    handshake per instance/request. http_compress shrinks bulk and
+    response payloads; the pool size covers a typical thread pool of
+    concurrent queries. The first caller's host wins for the process.
+    """
+    global _ES_CLIENT
+    if _ES_CLIENT is None:
+        _ES_CLIENT = Elasticsearch(es_host, **_client_kwargs())
+    return _ES_CLIENT
+
+
+def get_async_client(es_host: str) -> AsyncElasticsearch:
+    """Shared AsyncElasticsearch client for the FastAPI event loop.
+
+    Same pooling settings as get_client, but queries awaited directly
+    on the loop instead of hopping through the threadpool. Needs the
+    aiohttp extra (elasticsearch[async]).
+    """
+    global _ASYNC_ES_CLIENT
+    if _ASYNC_ES_CLIENT is None:
+        _ASYNC_ES_CLIENT = AsyncElasticsearch(es_host, **_client_kwargs())
+    return _ASYNC_ES_CLIENT
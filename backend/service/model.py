@@ -1,7 +1,7 @@
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass
+from typing import Iterable, List, Dict, Any, Optional
 
-@dataclass
+@dataclass(slots=True)
 class Track:
     track_id: str
     track_name: str
@@ -26,11 +26,17 @@ class Track:
         )
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary, excluding None values"""
-        result = asdict(self)
-        return {k: v for k, v in result.items() if v is not None}
+        """Convert to dictionary, excluding None values.
 
-@dataclass
+        Hand-rolled instead of asdict, which deep-copies every field --
+        this runs once per hit on every search response.
+        """
+        return {
+            field: value for field in self.__slots__
+            if (value := getattr(self, field)) is not None
+        }
+
+@dataclass(slots=True)
 class Album:
     artist:str
     name: str
@@ -38,9 +44,9 @@ class Album:
     
     
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {"artist": self.artist, "name": self.name, "nb_tracks": self.nb_tracks}
 
-@dataclass
+@dataclass(slots=True)
 class ArtistAlbums:
     artist: str
     total_albums: int
@@ -79,54 +85,78 @@ class ArtistAlbums:
             "albums": []
         }
 
-@dataclass
+@dataclass(slots=True)
+class _RawSearchResult:
+    """Similarity result whose tracks are already plain dicts.
+
+    Duck-types the parts of SearchResult the callers touch (results,
+    to_dict) without allocating a Track per hit on the hot k-NN path.
+    """
+    total_tracks: int
+    results: List[Dict[str, Any]]
+    filters: Dict[str, Any]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total_tracks": self.total_tracks,
+            "results": self.results,
+            "filters": self.filters
+        }
+
+@dataclass(slots=True)
 class SearchResult:
     total_tracks: int
-    results: List[Track]
+    results: Iterable[Track]
     filters: Optional[Dict[str, Any]] = None
     artist: Optional[str] = None  
     
     @classmethod
     def from_search_hits(cls, hits: List[Dict[str, Any]], total: int, 
                         filters: Dict[str, Any] = None, artist: str = None) -> 'SearchResult':
-        """Create SearchResult from Elasticsearch hits"""
-        tracks = []
-        for hit in hits:
-            tracks.append(Track.from_elasticsearch_hit(hit))
-        
+        """Create SearchResult from Elasticsearch hits.
+
+        results is a lazy generator: the Track objects only come into
+        existence inside to_dict, one at a time, instead of a full
+        List[Track] materialising per response.
+        """
         return cls(
             total_tracks=total,
-            results=tracks,
+            results=(Track.from_elasticsearch_hit(hit) for hit in hits),
             filters=filters,
             artist=artist
         )
     
-    @classmethod 
-    def from_similarity_search(cls, hits: List[Dict[str, Any]], 
-                              source_track_id: str, size: int) -> 'SearchResult':
-        """Create SearchResult from similarity search results"""
+    @classmethod
+    def from_similarity_search(cls, hits: List[Dict[str, Any]],
+                              source_track_id: str, size: int) -> '_RawSearchResult':
+        """Create a similarity result with track dicts built straight
+        from the hits, skipping the Track object round-trip.
+
+        The source track is excluded by the k-NN query filter, so every
+        hit here is a real neighbour.
+        """
         tracks = []
-        count = 0
-        
-        for hit in hits:
-            if hit['_id'] == source_track_id: 
-                continue
-            
-            if count >= size:
-                break
-                
-            similarity = hit['_score'] - 1.0
-            track = Track.from_elasticsearch_hit(hit, similarity)
-            tracks.append(track)
-            count += 1
-        
-        return cls(
-            total_tracks=count,
+
+        for hit in hits[:size]:
+            source = hit['_source']
+            tracks.append({
+                'track_id': source.get('track_id', hit.get('_id', '')),
+                'track_name': source.get('track_name', ''),
+                'album_name': source.get('album_name', ''),
+                'popularity': source.get('popularity', 0),
+                'track_genre': source.get('track_genre', ''),
+                'artists': source.get('artists', ''),
+                'similarity': hit['_score'] - 1.0
+            })
+
+        return _RawSearchResult(
+            total_tracks=len(tracks),
             results=tracks,
             filters={"similarity_search": True}
         )
     
     def to_dict(self) -> Dict[str, Any]:
+        # Consumes the results generator -- call once per instance
         result = {
             "total_tracks": self.total_tracks,
             "results": [track.to_dict() for track in self.results]
@@ -142,7 +172,7 @@ class SearchResult:
         
         return result
 
-@dataclass
+@dataclass(slots=True)
 class GenreStats:
     genre: str
     track_count: int
@@ -157,7 +187,7 @@ class GenreStats:
         """Create GenreStats from Elasticsearch aggregation bucket"""
         return cls(
             genre=genre,
-            track_count=int(agg["track_count"]["value"]),
+            track_count=int(agg["doc_count"]),
             avg_danceability=agg["avg_danceability"]["value"] or 0,
             avg_energy=agg["avg_energy"]["value"] or 0,
             avg_valence=agg["avg_valence"]["value"] or 0,
@@ -166,25 +196,28 @@ class GenreStats:
         )
     
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {field: getattr(self, field) for field in self.__slots__}
 
-@dataclass
+@dataclass(slots=True)
 class GenreComparison:
     genres: List[GenreStats]
     
     @classmethod
     def from_elasticsearch_result(cls, genre_list: List[str], 
                                  result: Dict[str, Any]) -> 'GenreComparison':
-        """Create GenreComparison from Elasticsearch aggregation result"""
+        """Create GenreComparison from the per_genre terms aggregation"""
+        buckets = {
+            bucket["key"]: bucket
+            for bucket in result["aggregations"]["per_genre"]["buckets"]
+        }
         genre_stats = []
-        
+
+        # Keep the caller's genre order, not the bucket doc_count order
         for genre in genre_list:
-            agg_key = f"genre_{genre.replace('-', '_')}"
-            if agg_key in result["aggregations"]:
-                agg = result["aggregations"][agg_key]
-                stats = GenreStats.from_aggregation(genre, agg)
+            if genre in buckets:
+                stats = GenreStats.from_aggregation(genre, buckets[genre])
                 genre_stats.append(stats)
-        
+
         return cls(genres=genre_stats)
     
     def to_dict(self) -> Dict[str, Any]:
@@ -192,7 +225,7 @@ class GenreComparison:
             "genres": [stats.to_dict() for stats in self.genres]
         }
 
-@dataclass
+@dataclass(slots=True)
 class Artist:
     rank: int
     artist: str
@@ -217,10 +250,12 @@ class Artist:
         return artist
     
     def to_dict(self) -> Dict[str, Any]:
-        result = asdict(self)
-        return {k: v for k, v in result.items() if v is not None}
+        return {
+            field: value for field in self.__slots__
+            if (value := getattr(self, field)) is not None
+        }
 
-@dataclass
+@dataclass(slots=True)
 class TopArtists:
     genre: str
     top_artists: List[Artist]
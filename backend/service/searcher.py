@@ -1,15 +1,32 @@
 from elasticsearch import Elasticsearch
 from typing import List, Union, Dict, Any
+from .es_client import get_client, get_async_client
 from .model import SearchResult, ArtistAlbums, TopArtists, GenreComparison, Track
+import logging
 import os
+
+logger = logging.getLogger(__name__)
+
+# O(1) membership instead of rebuilding a list per call
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at',
+    'is', 'are', 'was', 'were', 'this', 'that'
+})
+
 class SpotifySearcher:
-    
+
+    # The only fields the response models read; everything else
+    # (audio_vector above all) is dead weight on the wire
+    _TRACK_FIELDS = ('track_id', 'track_name', 'album_name',
+                     'popularity', 'track_genre', 'artists')
+
     def __init__(self, index_name="spotify_tracks", es_host=None):
         if es_host is None:
             es_host = os.getenv("ELASTICSEARCH_HOST", "http://elasticsearch:9200")
         if not es_host.startswith("http://") and not es_host.startswith("https://"):
             es_host = f"http://{es_host}"
-        self.client = Elasticsearch(es_host)
+        self.es_host = es_host
+        self.client = get_client(es_host)
         self.index_name = index_name
     def search_artist_albums(self, artist_name: str, size: int = 50) -> Dict[str, Any]:
         query = {
@@ -26,16 +43,17 @@ class SpotifySearcher:
     }
         result = self.client.search(index=self.index_name, body=query)
         total_tracks = result.get('hits', {}).get('total', {}).get('value', 0)
-        print(f"Total tracks by '{artist_name}': {total_tracks}")
+        logger.info("Total tracks by '%s': %d", artist_name, total_tracks)
         artist_albums = ArtistAlbums.from_elasticsearch_result(artist_name, result)
         return artist_albums.to_dict()
 
 
     def search_tracks_by_artist(self, artist_name: str, size: int = 100) -> Dict[str, Any]:
         query = {"match": {"artists": artist_name}}
-        result = self.client.search(index=self.index_name, query=query, size=size)
+        result = self.client.search(index=self.index_name, query=query, size=size,
+                                    source=list(self._TRACK_FIELDS))
         
-        print(f"Found {result['hits']['total']['value']} tracks by '{artist_name}':")
+        logger.info("Found %d tracks by '%s'", result['hits']['total']['value'], artist_name)
         
         search_result = SearchResult.from_search_hits(
             result['hits']['hits'],
@@ -44,10 +62,13 @@ class SpotifySearcher:
             artist=artist_name  
         )
         
-        for track in search_result.results:
-            print(f"- {track.track_name} from {track.album_name} (Popularity: {track.popularity})")
+        payload = search_result.to_dict()
+        if logger.isEnabledFor(logging.DEBUG):
+            for track in payload['tracks']:
+                logger.debug("- %s from %s (Popularity: %s)",
+                             track['track_name'], track['album_name'], track['popularity'])
         
-        return search_result.to_dict()
+        return payload
     
     def search_song_fuzzy(self, song_name: str, fuzziness: str = "AUTO", size: int = 10) -> Dict[str, Any]:
         """Search for songs with fuzzy matching"""
@@ -60,9 +81,10 @@ class SpotifySearcher:
             }
         }
         
-        result = self.client.search(index=self.index_name, query=query, size=size)
+        result = self.client.search(index=self.index_name, query=query, size=size,
+                                    source=list(self._TRACK_FIELDS))
         
-        print(f"Found {result['hits']['total']['value']} tracks similar to '{song_name}' (fuzzy matching):")
+        logger.info("Found %d tracks similar to '%s' (fuzzy matching)", result['hits']['total']['value'], song_name)
         
         search_result = SearchResult.from_search_hits(
             result['hits']['hits'],
@@ -70,17 +92,20 @@ class SpotifySearcher:
             filters={"search_type": "fuzzy", "query": song_name}
         )
         
-        for track in search_result.results:
-            print(f"- {track.track_name} by {track.artists}")
+        payload = search_result.to_dict()
+        if logger.isEnabledFor(logging.DEBUG):
+            for track in payload['results']:
+                logger.debug("- %s by %s", track['track_name'], track['artists'])
         
-        return search_result.to_dict()
+        return payload
     
     def search_song_phrase(self, song_name: str, size: int = 10) -> Dict[str, Any]:
         """Search for exact phrase matches"""
         query = {"match_phrase": {"track_name": song_name}}
-        result = self.client.search(index=self.index_name, query=query, size=size)
+        result = self.client.search(index=self.index_name, query=query, size=size,
+                                    source=list(self._TRACK_FIELDS))
         
-        print(f"Found {result['hits']['total']['value']} tracks with phrase '{song_name}':")
+        logger.info("Found %d tracks with phrase '%s'", result['hits']['total']['value'], song_name)
         
         search_result = SearchResult.from_search_hits(
             result['hits']['hits'],
@@ -88,10 +113,12 @@ class SpotifySearcher:
             filters={"search_type": "phrase", "query": song_name}
         )
         
-        for track in search_result.results:
-            print(f"- {track.track_name} by {track.artists}")
+        payload = search_result.to_dict()
+        if logger.isEnabledFor(logging.DEBUG):
+            for track in payload['results']:
+                logger.debug("- %s by %s", track['track_name'], track['artists'])
         
-        return search_result.to_dict()
+        return payload
     
     def search_song_partial(self, partial_title: str, size: int = 20) -> Dict[str, Any]:
         """Search for partial matches"""
@@ -103,9 +130,10 @@ class SpotifySearcher:
             }
         }
         
-        result = self.client.search(index=self.index_name, query=query, size=size)
+        result = self.client.search(index=self.index_name, query=query, size=size,
+                                    source=list(self._TRACK_FIELDS))
         
-        print(f"Found {result['hits']['total']['value']} tracks containing words from '{partial_title}':")
+        logger.info("Found %d tracks containing words from '%s'", result['hits']['total']['value'], partial_title)
         
         search_result = SearchResult.from_search_hits(
             result['hits']['hits'][:10],  
@@ -113,47 +141,84 @@ class SpotifySearcher:
             filters={"search_type": "partial", "query": partial_title}
         )
         
-        for track in search_result.results:
-            print(f"- {track.track_name} by {track.artists}")
+        payload = search_result.to_dict()
+        if logger.isEnabledFor(logging.DEBUG):
+            for track in payload['results']:
+                logger.debug("- %s by %s", track['track_name'], track['artists'])
         
-        return search_result.to_dict()
+        return payload
     
-    def song_searcher(self, song_title: str) -> Dict[str, Any]:
-        """Smart song search with fallback strategies"""
-        result_dict = self.search_song_phrase(song_title)
-        if result_dict["total_tracks"] > 0:
-            return result_dict
-        
-        stop_words = ['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 
-                     'is', 'are', 'was', 'were', 'this', 'that']
-        words = song_title.lower().split()
-        key_words = [word for word in words if word not in stop_words]
-        
-        if key_words:
-            key_phrase = ' '.join(key_words)
-            result_dict = self.search_song_partial(key_phrase)
-            if result_dict["total_tracks"] > 0:
-                return result_dict
-            
-            for word in key_words:
-                print(f"Trying fuzzy: '{word}'...")
-                result_dict = self.search_song_fuzzy(word)
-                if result_dict["total_tracks"] > 0:
-                    return result_dict
-        
-        print("No matches found with any strategy.")
-        
-        empty_result = SearchResult(
-            total_tracks=0,
-            results=[],
-            filters={"search_type": "smart", "query": song_title, "status": "no_matches"}
+    def _song_query(self, song_title: str) -> Dict[str, Any]:
+        """Build the smart-search bool/should query: phrase, keyword and
+        fuzzy strategies folded into a single round-trip, with boosts
+        reproducing the old fallback ordering"""
+        key_words = [word for word in song_title.lower().split()
+                     if word not in _STOP_WORDS]
+        key_phrase = ' '.join(key_words) if key_words else song_title
+
+        return {
+            "bool": {
+                "should": [
+                    {"match_phrase": {"track_name": {"query": song_title, "boost": 10}}},
+                    {"match": {"track_name": {"query": key_phrase, "boost": 3}}},
+                    {"multi_match": {
+                        "query": song_title,
+                        "fields": ["track_name"],
+                        "fuzziness": "AUTO",
+                        "boost": 1
+                    }}
+                ],
+                "minimum_should_match": 1
+            }
+        }
+
+    def _song_result(self, song_title: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        total = result['hits']['total']['value']
+
+        logger.info("Found %d tracks matching '%s' (smart search)", total, song_title)
+
+        if total == 0:
+            logger.info("No matches found with any strategy.")
+            empty_result = SearchResult(
+                total_tracks=0,
+                results=[],
+                filters={"search_type": "smart", "query": song_title, "status": "no_matches"}
+            )
+            return empty_result.to_dict()
+
+        search_result = SearchResult.from_search_hits(
+            result['hits']['hits'],
+            total,
+            filters={"search_type": "smart", "query": song_title}
         )
-        return empty_result.to_dict()
-    
+
+        payload = search_result.to_dict()
+        if logger.isEnabledFor(logging.DEBUG):
+            for track in payload['results']:
+                logger.debug("- %s by %s", track['track_name'], track['artists'])
+
+        return payload
+
+    def song_searcher(self, song_title: str) -> Dict[str, Any]:
+        """Smart song search (see _song_query for the strategy)"""
+        result = self.client.search(
+            index=self.index_name, query=self._song_query(song_title), size=10,
+            source=list(self._TRACK_FIELDS))
+        return self._song_result(song_title, result)
+
+    async def song_searcher_async(self, song_title: str) -> Dict[str, Any]:
+        """Smart song search awaited on the event loop, so FastAPI
+        serves it without a threadpool hop"""
+        result = await get_async_client(self.es_host).search(
+            index=self.index_name, query=self._song_query(song_title), size=10,
+            source=list(self._TRACK_FIELDS))
+        return self._song_result(song_title, result)
+
     def filter(self, genre: str = None, album: str = None, size: int = 20) -> Dict[str, Any]:
         """Filter tracks by genre and/or album with fuzzy fallback"""
         query = {
             "size": size,
+            "_source": list(self._TRACK_FIELDS),
             "query": {"bool": {"filter": []}}
         }
         
@@ -172,7 +237,7 @@ class SpotifySearcher:
         
         # If no results and album specified, try fuzzy search
         if result['hits']['total']['value'] == 0 and album:
-            print(f"No exact matches for album '{album}', searching for similar matches...")
+            logger.info("No exact matches for album '%s', searching for similar matches...", album)
             return self.fuzzy_album_search(genre, album, size, applied_filters)
 
         search_result = SearchResult.from_search_hits(
@@ -181,16 +246,19 @@ class SpotifySearcher:
             filters=applied_filters
         )
         
-        for track in search_result.results:
-            print(f"- {track.track_name} by {track.artists}")
+        payload = search_result.to_dict()
+        if logger.isEnabledFor(logging.DEBUG):
+            for track in payload['results']:
+                logger.debug("- %s by %s", track['track_name'], track['artists'])
         
-        return search_result.to_dict()
+        return payload
     
     def fuzzy_album_search(self, genre: str, album: str, size: int, 
                            applied_filters: Dict[str, Any]) -> Dict[str, Any]:
         
         fuzzy_query = {
             "size": size,
+            "_source": list(self._TRACK_FIELDS),
             "query": {
                 "bool": {
                     "filter": [],
@@ -220,28 +288,38 @@ class SpotifySearcher:
             filters=applied_filters
         )
         
-        for track in search_result.results:
-            print(f"- {track.track_name} by {track.artists}")
+        payload = search_result.to_dict()
+        if logger.isEnabledFor(logging.DEBUG):
+            for track in payload['results']:
+                logger.debug("- %s by %s", track['track_name'], track['artists'])
         
-        return search_result.to_dict()
+        return payload
     
     def find_similar_by_vector(self, track_id: str, size: int = 10) -> Union[Dict[str, Any], None]:
         try:
-            source_result = self.client.get(index=self.index_name, id=track_id)
+            source_result = self.client.get(
+                index=self.index_name, id=track_id,
+                source=['audio_vector', 'track_name', 'artists',
+                        'track_genre', 'popularity'])
             source_vector = source_result['_source']['audio_vector']
             source_track = source_result['_source']
             
-            print(f"\nFinding songs similar to:")
-            print(f"'{source_track['track_name']}' by {source_track['artists']}")
-            print(f"Genre: {source_track['track_genre']}, Popularity: {source_track['popularity']}")
+            logger.info("Finding songs similar to '%s' by %s (Genre: %s, Popularity: %s)",
+                        source_track['track_name'], source_track['artists'],
+                        source_track['track_genre'], source_track['popularity'])
             
+            # Exclude the source track inside the k-NN filter so ES
+            # returns exactly `size` neighbours instead of k+1 with a
+            # client-side skip
             search_query = {
                 "knn": {
                     "field": "audio_vector",
                     "query_vector": source_vector,
-                    "k": size + 1,
-                    "num_candidates": 1000
-                }
+                    "k": size,
+                    "num_candidates": 1000,
+                    "filter": {"bool": {"must_not": [{"ids": {"values": [track_id]}}]}}
+                },
+                "_source": list(self._TRACK_FIELDS)
             }
             
             result = self.client.search(index=self.index_name, body=search_query)
@@ -254,39 +332,94 @@ class SpotifySearcher:
             
 
             for track in search_result.results:
-                print(f"   Similarity: {track.similarity:.3f} | Genre: {track.track_genre}")
+                logger.debug("Similarity: %.3f | Genre: %s", track['similarity'], track['track_genre'])
             
             return search_result.to_dict()
             
         except Exception as e:
-            print(f"Error finding similar tracks: {e}")
+            logger.error("Error finding similar tracks: %s", e)
             return None
     
-    def compare_genres(self, genre_list: List[str]) -> Dict[str, Any]:
-        """Compare multiple genres"""
-        query = {
+    def find_similar_batch(self, track_ids: List[str], size: int = 10) -> Dict[str, Any]:
+        """Find similar tracks for many source tracks in two round-trips:
+        one mget for all source vectors, one msearch of k-NN queries"""
+        sources = self.client.mget(
+            index=self.index_name,
+            body={'ids': track_ids},
+            _source=['audio_vector', 'track_name', 'artists', 'track_genre', 'popularity']
+        )
+
+        lines = []
+        found_ids = []
+        for doc in sources['docs']:
+            if not doc.get('found'):
+                logger.debug("Track '%s' not found, skipping", doc.get('_id'))
+                continue
+            found_ids.append(doc['_id'])
+            lines.append({"index": self.index_name})
+            lines.append({
+                "knn": {
+                    "field": "audio_vector",
+                    "query_vector": doc['_source']['audio_vector'],
+                    "k": size,
+                    "num_candidates": 1000,
+                    "filter": {"bool": {"must_not": [{"ids": {"values": [doc['_id']]}}]}}
+                },
+                "_source": list(self._TRACK_FIELDS)
+            })
+
+        results = {}
+        if lines:
+            responses = self.client.msearch(body=lines)['responses']
+            for track_id, response in zip(found_ids, responses):
+                search_result = SearchResult.from_similarity_search(
+                    response.get('hits', {}).get('hits', []),
+                    track_id,
+                    size
+                )
+                results[track_id] = search_result.to_dict()
+
+        return results
+
+    def _compare_query(self, genre_list: List[str]) -> Dict[str, Any]:
+        return {
             "size": 0,
-            "aggs": {}
-        }
-        
-        for genre in genre_list:
-            query["aggs"][f"genre_{genre.replace('-', '_')}"] = {
-                "filter": {"term": {"track_genre": genre}},
-                "aggs": {
-                    "avg_danceability": {"avg": {"field": "danceability"}},
-                    "avg_energy": {"avg": {"field": "energy"}},
-                    "avg_valence": {"avg": {"field": "valence"}},
-                    "avg_popularity": {"avg": {"field": "popularity"}},
-                    "avg_tempo": {"avg": {"field": "tempo"}},
-                    "track_count": {"value_count": {"field": "track_id.keyword"}} 
+            "query": {"terms": {"track_genre": genre_list}},
+            "aggs": {
+                "per_genre": {
+                    "terms": {
+                        "field": "track_genre",
+                        "include": genre_list,
+                        "size": len(genre_list)
+                    },
+                    "aggs": {
+                        "avg_danceability": {"avg": {"field": "danceability"}},
+                        "avg_energy": {"avg": {"field": "energy"}},
+                        "avg_valence": {"avg": {"field": "valence"}},
+                        "avg_popularity": {"avg": {"field": "popularity"}},
+                        "avg_tempo": {"avg": {"field": "tempo"}}
+                    }
                 }
             }
-        
-        result = self.client.search(index=self.index_name, body=query)
+        }
+
+    def compare_genres(self, genre_list: List[str]) -> Dict[str, Any]:
+        """Compare multiple genres with one single-pass terms aggregation"""
+        result = self.client.search(
+            index=self.index_name, body=self._compare_query(genre_list))
 
         comparison = GenreComparison.from_elasticsearch_result(genre_list, result)
         return comparison.to_dict()
-    
+
+    async def compare_genres_async(self, genre_list: List[str]) -> Dict[str, Any]:
+        """Async variant of compare_genres for the API event loop"""
+        result = await get_async_client(self.es_host).search(
+            index=self.index_name, body=self._compare_query(genre_list))
+
+        comparison = GenreComparison.from_elasticsearch_result(genre_list, result)
+        return comparison.to_dict()
+
+
     def top_artists_per_genre(self, genre: str, size: int = 10) -> Dict[str, Any]:
 
         query = {
@@ -297,19 +430,14 @@ class SpotifySearcher:
                     "terms": {
                         "field": "artists.keyword",
                         "size": 500,
+                        # Native replacement for the old bucket_selector
+                        # script (params.track_count >= 2): no painless
+                        # eval per bucket
+                        "min_doc_count": 2,
                         "order": {"avg_popularity": "desc"}
                     },
                     "aggs": {
-                        "avg_popularity": {"avg": {"field": "popularity"}},
-                        "popularity_filter": {
-                            "bucket_selector": {
-                                "buckets_path": {
-                                    "avg_pop": "avg_popularity",
-                                    "track_count": "_count"
-                                },
-                                "script": "params.track_count >= 2"
-                            }
-                        }
+                        "avg_popularity": {"avg": {"field": "popularity"}}
                     }
                 }
             }
@@ -0,0 +1,55 @@
+import os
+import sys
+from pathlib import Path
+
+import polars as pl
+
+# Add the project root to Python path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from backend.service.searcher import SpotifySearcher
+
+SNAPSHOT_DIR = Path(os.getenv('SNAPSHOT_DIR', 'data/cache'))
+SNAPSHOT_GENRES = ["rock", "pop", "electronic", "jazz", "hip-hop", "country",
+                   "classical", "metal", "indie", "folk", "r-n-b", "dance"]
+
+
+def build_snapshots():
+    """Materialise genre/artist aggregates to Parquet snapshots.
+
+    Run periodically (e.g. hourly cron or a docker-compose sidecar) so the
+    Streamlit dashboard can read small pre-aggregated tables from disk
+    instead of re-running the Elasticsearch aggregations per session.
+    """
+    searcher = SpotifySearcher()
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+
+    comparison = searcher.compare_genres(SNAPSHOT_GENRES)
+    pl.DataFrame(comparison['genres']).write_parquet(SNAPSHOT_DIR / "genre_compare.parquet")
+    print(f"✓ Wrote genre_compare.parquet ({len(comparison['genres'])} genres)")
+
+    for genre in SNAPSHOT_GENRES:
+        # 20 rows = the dashboard slider's max, so any Top-N view can be
+        # sliced out of the snapshot without another aggregation
+        ranking = searcher.top_artists_per_genre(genre, size=20)
+        if ranking['top_artists']:
+            pl.DataFrame(ranking['top_artists']).write_parquet(
+                SNAPSHOT_DIR / f"top_artists_{genre}.parquet")
+            print(f"✓ Wrote top_artists_{genre}.parquet")
+
+
+def main():
+    print("🎵 Spotify Music Explorer - Snapshot Builder")
+    print("=" * 50)
+
+    try:
+        build_snapshots()
+        print("\n🎉 Snapshots written to", SNAPSHOT_DIR)
+    except Exception as e:
+        print(f"✗ Snapshot build failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
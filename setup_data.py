@@ -1,5 +1,10 @@
+import argparse
+import logging
+import multiprocessing
 import os
+import queue
 import sys
+import threading
 import time
 from pathlib import Path
 
@@ -7,29 +12,132 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
+from elasticsearch.exceptions import ConnectionError as ESConnectionError, TransportError
+
 from backend.service.indexer import Indexer
 from backend.service.downloader import Downloader
 
-def wait_for_elasticsearch(max_retries=10, delay=5):
-    """Wait for Elasticsearch to be ready"""
+# Service modules log through logging; mirror the API's setup so their
+# output shows up when running this script standalone
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+def wait_for_elasticsearch(max_retries=10, delay=0.25):
+    """Wait for Elasticsearch to be ready.
+
+    A cheap ping establishes reachability, then cluster.health with
+    wait_for_status blocks server-side and returns the moment the
+    cluster turns yellow — no poll-interval quantization. Backoff
+    (250ms doubling to 5s) only kicks in while the node is not even
+    accepting connections. Only connection-level errors trigger a
+    retry; anything else (bad config, auth) fails fast. Only the first
+    miss, success and final failure hit stdout; the in-between attempts
+    go to debug so the tight backoff loop isn't throttled by the
+    docker log driver.
+    """
     print("Waiting for Elasticsearch to be ready...")
-    
+
+    indexer = Indexer()
+    backoff = delay
+    reason = "no attempts made"
     for attempt in range(max_retries):
         try:
-            indexer = Indexer()
-            info = indexer.client.info()
-            print(f"✓ Elasticsearch is ready: {info['cluster_name']} v{info['version']['number']}")
-            return True
-        except Exception as e:
-            print(f"Attempt {attempt + 1}/{max_retries}: Elasticsearch not ready ({e})")
-            if attempt < max_retries - 1:
-                print(f"Retrying in {delay} seconds...")
-                time.sleep(delay)
-    
-    print("✗ Failed to connect to Elasticsearch after all retries")
+            if indexer.client.ping():
+                health = indexer.client.cluster.health(
+                    wait_for_status='yellow', timeout='30s')
+                if not health.get('timed_out'):
+                    print(f"✓ Elasticsearch is ready: {health['cluster_name']} (status: {health['status']})")
+                    return True
+                reason = "cluster not yellow within 30s"
+            else:
+                reason = "not reachable"
+        except (ESConnectionError, TransportError) as e:
+            reason = str(e)
+
+        if attempt == 0:
+            print(f"Elasticsearch not ready yet ({reason}); retrying...")
+        else:
+            logger.debug("Attempt %d/%d: %s", attempt + 1, max_retries, reason)
+
+        if attempt < max_retries - 1:
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 5.0)
+
+    print(f"✗ Failed to connect to Elasticsearch after {max_retries} attempts (last: {reason})")
     return False
 
-def setup_data():
+def run_pipeline(downloader, indexer, batch_size=None):
+    """Download, parse and index as one overlapped pipeline.
+
+    A producer thread downloads the dataset and parses CSV chunks
+    into bulk actions while the main thread drains them into
+    parallel_bulk, so Elasticsearch is already indexing while the
+    next chunk is still being parsed. The bounded queue keeps at
+    most a few chunks of actions in memory at once.
+    """
+    batches = queue.Queue(maxsize=4)
+    done = object()
+    errors = []
+
+    def produce():
+        try:
+            input_file = downloader.download_spotify_data()
+            print(f"✓ Data downloaded to: {input_file}")
+            for batch in indexer.iter_action_batches(input_file):
+                batches.put(batch)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            batches.put(done)
+
+    def actions():
+        while True:
+            batch = batches.get()
+            if batch is done:
+                break
+            yield from batch
+
+    if batch_size is None:
+        batch_size = indexer.chunk_size
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    indexed = indexer._run_bulk(actions(), batch_size, indexer.thread_count)
+    producer.join()
+
+    if errors:
+        raise errors[0]
+    return indexed
+
+def _index_range(input_file, skip_rows, nrows):
+    """Worker entry point: index one row slice (runs in its own process)"""
+    indexer = Indexer()
+    return indexer.index_range(input_file, skip_rows, nrows)
+
+def index_in_parallel(input_file, workers):
+    """Shard the CSV across worker processes by disjoint row ranges.
+
+    Each worker parses and bulk-indexes only its slice, so throughput
+    is no longer capped by one interpreter's serialization rate. Spawn
+    (not fork) so no worker inherits the parent's live ES connections.
+    """
+    with open(input_file, 'rb') as f:
+        total_rows = sum(1 for _ in f) - 1  # minus header
+
+    per_worker = -(-total_rows // workers)  # ceil
+    ranges = [(input_file, i * per_worker, per_worker) for i in range(workers)]
+
+    print(f"Indexing {total_rows} rows across {workers} worker processes...")
+    ctx = multiprocessing.get_context('spawn')
+    with ctx.Pool(workers) as pool:
+        counts = pool.starmap(_index_range, ranges)
+
+    print(f"✓ Indexed {sum(counts)} documents across {workers} workers")
+    return sum(counts)
+
+def setup_data(force_recreate=False, workers=1):
     """Download and index Spotify data"""
     try:
         # Wait for Elasticsearch
@@ -41,35 +149,32 @@ def setup_data():
         indexer = Indexer()
         downloader = Downloader()
         
-        # Check if index already exists
-        if indexer.check_index():
-            print("✓ Index already exists")
-            
-            # Ask user if they want to recreate
-            response = input("Do you want to recreate the index? (y/N): ").strip().lower()
-            if response not in ['y', 'yes']:
-                print("Skipping data setup")
-                return True
-            
-            print("Deleting existing index...")
-            indexer.delete_index()
-        
-        print("Starting data download and indexing...")
-        
-        # Download data
-        print("1. Downloading Spotify data...")
-        input_file = downloader.download_spotify_data()
-        print(f"✓ Data downloaded to: {input_file}")
-        
-        # Load and index data
-        print("2. Loading data...")
-        indexer.load_data(input_file)
-        print("✓ Data loaded")
-        
-        print("3. Indexing data (this may take a while)...")
-        indexer.index_data()
+        # Only prompt on a real terminal; CI/orchestrators pass
+        # --force-recreate instead
+        force = force_recreate
+        if not force and sys.stdin.isatty() and \
+                indexer.client.indices.exists(index=indexer.index_name):
+            response = input("Index already exists. Do you want to recreate it? (y/N): ").strip().lower()
+            force = response in ['y', 'yes']
+
+        if not indexer.recreate_index(force=force):
+            print("✓ Index already exists, skipping data setup")
+            return True
+
+        print("Starting data download and indexing (this may take a while)...")
+        indexer.tune_for_ingest()
+        try:
+            if workers > 1:
+                input_file = downloader.download_spotify_data()
+                print(f"✓ Data downloaded to: {input_file}")
+                index_in_parallel(input_file, workers)
+            else:
+                run_pipeline(downloader, indexer)
+        finally:
+            # Even a failed ingest should leave the index refreshing
+            indexer.restore_after_ingest()
         print("✓ Data indexed successfully")
-        
+
         return True
         
     except Exception as e:
@@ -78,6 +183,15 @@ def setup_data():
 
 def main():
     """Main setup function"""
+    parser = argparse.ArgumentParser(description="Download and index the Spotify dataset")
+    parser.add_argument('--force-recreate', action='store_true',
+                        help='recreate the index without prompting')
+    parser.add_argument('--yes', '-y', action='store_true',
+                        help="skip the 'Is Elasticsearch running?' prompt")
+    parser.add_argument('--workers', type=int, default=1,
+                        help='index with N worker processes sharded by row range')
+    args = parser.parse_args()
+
     print("🎵 Spotify Music Explorer - Data Setup")
     print("=" * 50)
     
@@ -86,15 +200,16 @@ def main():
     print("  docker-compose up elasticsearch")
     print()
     
-    response = input("Is Elasticsearch running? (y/N): ").strip().lower()
-    if response not in ['y', 'yes']:
-        print("Please start Elasticsearch first:")
-        print("  docker-compose up elasticsearch")
-        return
+    if not args.yes and sys.stdin.isatty():
+        response = input("Is Elasticsearch running? (y/N): ").strip().lower()
+        if response not in ['y', 'yes']:
+            print("Please start Elasticsearch first:")
+            print("  docker-compose up elasticsearch")
+            return
     
     print("\nStarting data setup...")
     
-    if setup_data():
+    if setup_data(force_recreate=args.force_recreate, workers=args.workers):
         print("\n🎉 Setup completed successfully!")
         print("\nYou can now start your application:")
         print("  docker-compose up spotify-app")